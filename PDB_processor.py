@@ -3,7 +3,7 @@
 """
 PDB_processor.py
 Simple PDB file cleaning script using Biopython.
-Dependencies: Biopython (pip install biopython) or (conda install conda-forge::biopython)
+Dependencies: Biopython (pip install biopython) or (conda install conda-forge::biopython), NumPy (installed with Biopython)
 
 Author: Aaryesh Deshpande (aaryeshad@gmail.com)
 Date: 01-14-2025
@@ -12,8 +12,15 @@ Date: 01-14-2025
 # Import Modules
 
 import os
+import importlib.util
+import mmap
+import glob
 import argparse
-from Bio.PDB import PDBParser, PDBIO
+from collections import defaultdict
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 # Suppress PDB warnings
 import warnings
@@ -21,130 +28,507 @@ from Bio import BiopythonWarning
 warnings.simplefilter('ignore', BiopythonWarning)
 
 # List of standard amino acids and common protonation variants
-aal_prot = {
+aal_prot = frozenset({
     "ALA", "ARG", "ASN", "ASP", "CYS", "GLN", "GLU", "GLY", "HIS", "ILE", 
     "LEU", "LYS", "MET", "PHE", "PRO", "SER", "THR", "TRP", "TYR", "VAL",
     "ASH", "GLH", "HIE", "HID", "HIP", "LYN", "CYX", "CYM", "TYM"
-}
+})
+
+# Byte-encoded residue names for the line filter, which compares raw resName columns
+AAL_PROT_B = frozenset(s.encode("ascii") for s in aal_prot)
+
+# Shared Biopython parser and writer (plus the empty structure the writer is reset to), created on first use by _init_worker
+_PARSER = None
+_IO = None
+_EMPTY_STRUCTURE = None
+
+# Numba-compiled line filter kernel, built on first use by _get_line_filter(use_jit=True)
+_line_filter_jit = None
+
+# Residue classes returned by the cached residue name classifier
+_PROT, _HOH, _HET_DROP, _HET_KEEP = range(4)
+
+# Multiplicative hash constants for the 512-bit residue name Bloom filter
+_BLOOM_MUL1 = 0x9E3779B1
+_BLOOM_MUL2 = 0x85EBCA6B
+
+# Record names packed little-endian into integers, as read by the line filter kernel
+_ATOM_CODE = int.from_bytes(b"ATOM  ", "little")
+_HETATM_CODE = int.from_bytes(b"HETATM", "little")
+_MODEL_CODE = int.from_bytes(b"MODEL ", "little")
+_ENDMDL_CODE = int.from_bytes(b"ENDMDL", "little")
+_TER_CODE = int.from_bytes(b"TER", "little")
+_END_CODE = int.from_bytes(b"END", "little")
 
 # Function Definitions
 # Removes water molecules from the structure
 def remove_water(structure):
     """Remove water molecules from the structure."""
     for model in structure:
-        for chain in list(model):
-            for residue in list(chain):
-                if residue.get_resname() == "HOH":
-                    chain.detach_child(residue.id)
+        for chain in model:
+            detach = chain.detach_child
+            # Walk residues backwards so detaching never shifts the ones still to visit
+            child_list = chain.child_list
+            for i in range(len(child_list) - 1, -1, -1):
+                residue = child_list[i]
+                if residue.resname == "HOH":
+                    detach(residue.id)
     return structure
 
 # Keeps only standard protein residues in the structure
 def keep_only_protein(structure):
     """Keep only standard protein residues in the structure."""
     for model in structure:
-        for chain in list(model):
-            for residue in list(chain):
-                if residue.get_resname() not in aal_prot:
-                    chain.detach_child(residue.id)
+        for chain in model:
+            detach = chain.detach_child
+            child_list = chain.child_list
+            for i in range(len(child_list) - 1, -1, -1):
+                residue = child_list[i]
+                if residue.resname not in aal_prot:
+                    detach(residue.id)
     return structure
 
 # Removes specified heteroatoms from the structure
 def remove_heteroatoms(structure, hetatm_set):
     """Remove specified heteroatoms from the structure."""
     for model in structure:
-        for chain in list(model):
-            for residue in list(chain):
-                if residue.get_resname() in hetatm_set:
-                    chain.detach_child(residue.id)
+        for chain in model:
+            detach = chain.detach_child
+            child_list = chain.child_list
+            for i in range(len(child_list) - 1, -1, -1):
+                residue = child_list[i]
+                if residue.resname in hetatm_set:
+                    detach(residue.id)
     return structure
 
-# Extracts residues from the structure and returns as a list of dictionaries
+# Builds a cached residue name classifier for one set of heteroatoms to remove
+def _make_classifier(hetatm_set):
+    """Return an LRU-cached function mapping a residue name to its residue class."""
+    @lru_cache(maxsize=64)
+    def classify(resname):
+        if resname in hetatm_set:
+            return _HET_DROP
+        if resname in aal_prot:
+            return _PROT
+        if resname == "HOH":
+            return _HOH
+        return _HET_KEEP
+    return classify
+
+# Applies all cleaning filters to the structure in a single traversal
+def clean_structure(structure, hetatm_set, keep_protein_only, remove_water_flag):
+    """Remove water, non-protein residues, and specified heteroatoms in one pass over the structure."""
+    classify = _make_classifier(frozenset(hetatm_set))
+    drop_classes = {_HET_DROP}
+    if remove_water_flag or keep_protein_only:
+        drop_classes.add(_HOH)
+    if keep_protein_only:
+        drop_classes.add(_HET_KEEP)
+
+    for model in structure:
+        for chain in model:
+            # Rebuild the chain's children once instead of calling detach_child (an O(n) list.remove) per residue
+            kept = []
+            for residue in chain.child_list:
+                if classify(residue.resname) in drop_classes:
+                    residue.detach_parent()
+                else:
+                    kept.append(residue)
+            if len(kept) != len(chain.child_list):
+                chain.child_list = kept
+                chain.child_dict = {residue.id: residue for residue in kept}
+    return structure
+
+# Extracts residues from the structure into parallel arrays (resname, chain ID, residue number, residue object)
 def get_residues(structure):
-    """Extract residues from the structure and return as a list of dictionaries."""
-    residues = []
+    """Extract residues from the structure as parallel arrays of residue names, chain IDs, numbers, and objects."""
+    n = sum(len(chain) for model in structure for chain in model)
+    resnames = np.empty(n, dtype='S3')
+    chain_ids = np.empty(n, dtype='S1')
+    resnums = np.empty(n, dtype='i4')
+    residue_objs = np.empty(n, dtype=object)
+    i = 0
     for model in structure:
         for chain in model:
-            for residue in chain:
-                residues.append({
-                    'resname': residue.get_resname(),
-                    'resnum': residue.get_id()[1],
-                    'chain_id': chain.id,
-                    'residue': residue
-                })
-    return residues
+            child_list = chain.child_list
+            j = i + len(child_list)
+            # Columns are filled one chain at a time; the chain ID is a single broadcast write
+            resnames[i:j] = [residue.resname for residue in child_list]
+            chain_ids[i:j] = chain.id
+            resnums[i:j] = [residue.id[1] for residue in child_list]
+            for k, residue in enumerate(child_list, i):
+                residue_objs[k] = residue
+            i = j
+    return resnames, chain_ids, resnums, residue_objs
 
 # Splits residues into chains based on chain IDs and separates heteroatoms
 def split_residues(residues):
     """Split residues into chains based on chain IDs and separate heteroatoms."""
-    chains = {}
-    hetero_chains = {}
+    resnames, chain_ids, _, residue_objs = residues
+    aal_arr = np.array(sorted(aal_prot), dtype='S3')
+    is_prot = np.isin(resnames, aal_arr)
 
-    for res in residues:
-        chain_id = res['chain_id']
-        resname = res['resname']
+    # Group protein residues per chain in one pass: stable-sort by chain, then split at the boundaries
+    unique_chains, first_idx, inverse, counts = np.unique(
+        chain_ids[is_prot], return_index=True, return_inverse=True, return_counts=True
+    )
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(residue_objs[is_prot][order], np.cumsum(counts)[:-1])
+    chains = {unique_chains[k].decode(): list(groups[k]) for k in np.argsort(first_idx)}
 
-        if resname in aal_prot:
-            if chain_id not in chains:
-                chains[chain_id] = []
-            chains[chain_id].append(res['residue'])
+    hetero_chains = defaultdict(lambda: defaultdict(list))
+    for chain_id, resname, residue in zip(chain_ids[~is_prot], resnames[~is_prot], residue_objs[~is_prot]):
+        hetero_chains[chain_id.decode()][resname.decode()].append(residue)
+
+    # Return plain dicts: picklable for process pools, and lookups of missing keys do not insert them
+    return chains, {chain_id: dict(groups) for chain_id, groups in hetero_chains.items()}
+
+# Packs a 3-byte residue name into an integer (three ASCII bytes plus a zero byte)
+def _pack_resname(name):
+    """Pack a 3-byte residue name into an integer key."""
+    return name[0] | (name[1] << 8) | (name[2] << 16)
+
+# Builds a sorted lookup table of packed residue names for the line filter kernel
+def _resname_table(names):
+    """Return the packed 3-byte residue names as a sorted uint32 array."""
+    return np.array(sorted(_pack_resname(n) for n in names if len(n) == 3), dtype=np.uint32)
+
+# Hashes a packed residue name to two bit positions of a 512-bit Bloom filter
+def _bloom_hashes(packed):
+    """Return the two Bloom filter bit positions (0-511) of a packed residue name."""
+    return ((packed * _BLOOM_MUL1) >> 20) & 511, ((packed * _BLOOM_MUL2) >> 23) & 511
+
+# Builds a 512-bit Bloom filter (8 int64 words) over a table of packed residue names
+def _bloom_filter(table):
+    """Return the Bloom filter bits of the packed residue names as an int64 array of 8 words."""
+    bits = 0
+    for packed in table.tolist():
+        h1, h2 = _bloom_hashes(packed)
+        bits |= (1 << h1) | (1 << h2)
+    words = [(bits >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(8)]
+    return np.array([w - (1 << 64) if w >= 1 << 63 else w for w in words], dtype=np.int64)
+
+_AAL_PROT_TABLE = _resname_table(AAL_PROT_B)
+_AAL_PROT_BLOOM = _bloom_filter(_AAL_PROT_TABLE)
+
+# Marks the lines of a PDB buffer that survive the cleaning flags
+def _filter_lines_kernel(buf, line_starts, allow_table, allow_bloom, deny_table, keep_protein_only):
+    """Return a keep mask over the lines of buf and whether an END record was kept."""
+    n_lines = line_starts.shape[0] - 1
+    keep = np.zeros(n_lines, dtype=np.bool_)
+    after_atom = False
+    wrote_end = False
+    # Native hash sets of packed residue names, built once per call inside compiled code
+    allow_set = set(allow_table)
+    deny_set = set(deny_table)
+    for k in range(n_lines):
+        start = line_starts[k]
+        end = line_starts[k + 1]
+
+        # Record name (columns 1-6), zero-padded past the end of short lines
+        code = 0
+        for j in range(6):
+            if start + j < end:
+                code |= np.int64(buf[start + j]) << (8 * j)
+
+        if code == _ATOM_CODE or code == _HETATM_CODE:
+            packed = 0
+            for j in range(3):
+                if start + 17 + j < end:
+                    packed |= np.int64(buf[start + 17 + j]) << (8 * j)
+            if keep_protein_only:
+                # Two bit tests reject most non-protein names before the set lookup
+                h1 = ((packed * _BLOOM_MUL1) >> 20) & 511
+                h2 = ((packed * _BLOOM_MUL2) >> 23) & 511
+                if not ((allow_bloom[h1 >> 6] >> (h1 & 63)) & (allow_bloom[h2 >> 6] >> (h2 & 63)) & 1):
+                    continue
+            resname = np.uint32(packed)
+            if resname in deny_set or (keep_protein_only and resname not in allow_set):
+                continue
+            keep[k] = True
+            after_atom = True
+        elif code & 0xFFFFFF == _TER_CODE:
+            keep[k] = after_atom
+            after_atom = False
+        elif code == _MODEL_CODE or code == _ENDMDL_CODE:
+            keep[k] = True
+            after_atom = False
+        elif code & 0xFFFFFF == _END_CODE:
+            # Plain END record: anything after the record name is whitespace
+            is_end = True
+            for j in range(3, 6):
+                c = (code >> (8 * j)) & 0xFF
+                if c != 0 and c != 9 and c != 10 and c != 13 and c != 32:
+                    is_end = False
+            if is_end:
+                keep[k] = True
+                wrote_end = True
+    return keep, wrote_end
+
+# Gathers fixed columns of every line in a PDB buffer, zero-padded past the end of short lines
+def _gather_columns(buf, line_starts, first, last):
+    """Return an (n_lines, last - first) uint8 array holding columns first..last-1 of each line."""
+    cols = line_starts[:-1, None] + np.arange(first, last)
+    inside = cols < line_starts[1:, None]
+    return np.where(inside, buf[np.minimum(cols, buf.shape[0] - 1)], 0).astype(np.uint8)
+
+# Marks the lines of a PDB buffer that survive the cleaning flags, using whole-array NumPy operations
+def _filter_lines_numpy(buf, line_starts, allow_table, allow_bloom, deny_table, keep_protein_only):
+    """Vectorized equivalent of _filter_lines_kernel and the default line filter (allow_bloom is kernel-only)."""
+    record = _gather_columns(buf, line_starts, 0, 6).astype(np.int64)
+    code = np.bitwise_or.reduce(record << (8 * np.arange(6)), axis=1)
+    is_coord = (code == _ATOM_CODE) | (code == _HETATM_CODE)
+    is_ter = (code & 0xFFFFFF) == _TER_CODE
+    is_model = (code == _MODEL_CODE) | (code == _ENDMDL_CODE)
+    is_end = ((code & 0xFFFFFF) == _END_CODE) & np.isin(record[:, 3:], (0, 9, 10, 13, 32)).all(axis=1)
+
+    resname = _gather_columns(buf, line_starts, 17, 20).astype(np.uint32)
+    packed = resname[:, 0] | (resname[:, 1] << 8) | (resname[:, 2] << 16)
+    keep = is_coord & ~np.isin(packed, deny_table)
+    if keep_protein_only:
+        keep &= np.isin(packed, allow_table)
+
+    # Keep a chain terminator only when an atom was kept since the previous TER/MODEL/ENDMDL record
+    line_idx = np.arange(keep.shape[0])
+    last_kept_atom = np.maximum.accumulate(np.where(keep, line_idx, -1))
+    last_reset = np.maximum.accumulate(np.where(is_ter | is_model, line_idx, -1))
+    prev_reset = np.concatenate(([-1], last_reset[:-1]))
+    ter_kept = is_ter & (last_kept_atom > prev_reset)
+
+    keep |= is_model | is_end | ter_kept
+    return keep, bool(is_end.any())
+
+# Selects the line filter implementation, compiling the Numba kernel on first use when requested
+def _get_line_filter(use_jit=False):
+    """Return the NumPy line filter, or the JIT-compiled kernel when use_jit is set and Numba is installed."""
+    global _line_filter_jit
+    # Importing and loading Numba costs ~0.5 s per process, more than the kernel saves on typical files
+    if not use_jit:
+        return _filter_lines_numpy
+    if _line_filter_jit is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _line_filter_jit = _filter_lines_numpy
         else:
-            if chain_id not in hetero_chains:
-                hetero_chains[chain_id] = {}
-            if resname not in hetero_chains[chain_id]:
-                hetero_chains[chain_id][resname] = []
-            hetero_chains[chain_id][resname].append(res['residue'])
+            _line_filter_jit = njit(cache=True)(_filter_lines_kernel)
+            # Compile on a tiny read-only buffer so the first real call never holds a view of a
+            # memory-mapped file in the compiler's reference cycles (which would block mm.close())
+            _line_filter_jit(np.frombuffer(b"END\n", dtype=np.uint8), np.array([0, 4], dtype=np.int64),
+                             _AAL_PROT_TABLE, _AAL_PROT_BLOOM, np.empty(0, dtype=np.uint32), False)
+    return _line_filter_jit
+
+# Encodes residue names as the raw 3-byte resName field of PDB records
+def encode_resnames(names):
+    """Return the residue names as a frozenset of ASCII bytes right-justified to 3 columns."""
+    # Residue names occupy columns 18-20 and are right-justified, so compare raw 3-byte slices
+    return frozenset(name.encode("ascii").rjust(3) for name in names)
+
+# Filters the PDB file record by record without building a Biopython structure
+def filter_pdb_lines(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag, hetatm_bytes=None,
+                     use_jit=False):
+    """Memory-map the PDB file, mark the records that survive the cleaning flags, and write them."""
+    if hetatm_bytes is None:
+        hetatm_bytes = encode_resnames(hetatm_set)
+    deny = set(hetatm_bytes)
+    if remove_water_flag or keep_protein_only:
+        deny.add(b"HOH")
+    deny_table = _resname_table(deny)
+    filter_lines = _get_line_filter(use_jit)
+
+    # Collect the kept records before opening the output, so cleaning a file in place works
+    kept = []
+    wrote_end = False
+    with open(input_file, "rb") as fin:
+        if os.fstat(fin.fileno()).st_size:
+            mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                buf = np.frombuffer(mm, dtype=np.uint8)
+                line_starts = np.concatenate(([0], np.flatnonzero(buf == 0x0A) + 1)).astype(np.int64)
+                if line_starts[-1] != buf.shape[0]:
+                    line_starts = np.append(line_starts, buf.shape[0])
+                keep, wrote_end = filter_lines(buf, line_starts, _AAL_PROT_TABLE, _AAL_PROT_BLOOM, deny_table, keep_protein_only)
+                kept = [mm[line_starts[k]:line_starts[k + 1]] for k in np.flatnonzero(keep)]
+            except BaseException:
+                # Traceback frames may still hold views of the map; never let the close error mask the real one
+                buf = None
+                try:
+                    mm.close()
+                except BufferError:
+                    pass
+                raise
+            # Drop the array view so the map (and the file handle behind it) can be closed now
+            buf = None
+            mm.close()
+
+    with open(output_file, "wb") as fout:
+        fout.writelines(kept)
+        if not wrote_end:
+            # Terminate a last record that lacks its newline before appending END
+            if kept and not kept[-1].endswith(b"\n"):
+                fout.write(b"\n")
+            fout.write(b"END\n")
+
+# Checks once whether the optional gemmi package is installed, without importing it
+@lru_cache(maxsize=None)
+def _gemmi_available():
+    """Return True when gemmi can be imported for the --fast path."""
+    return importlib.util.find_spec("gemmi") is not None
+
+# Cleans the PDB file with gemmi's C++ parser and writer
+def clean_with_gemmi(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag):
+    """Read, clean, and write the PDB file with gemmi instead of Biopython."""
+    # gemmi is only imported when --fast is used (pip install gemmi)
+    import gemmi
+    st = gemmi.read_structure(input_file)
+    remove_water_flag = remove_water_flag or keep_protein_only
+    for model in st:
+        for chain in model:
+            for i in range(len(chain) - 1, -1, -1):
+                resname = chain[i].name
+                # Only HOH counts as water, as on the other paths (gemmi's remove_waters also drops WAT/DOD)
+                if ((remove_water_flag and resname == "HOH")
+                        or (keep_protein_only and resname not in aal_prot)
+                        or resname in hetatm_set):
+                    del chain[i]
+    st.remove_empty_chains()
+    # Entities mark where polymers end, which write_pdb needs to emit TER records
+    st.setup_entities()
+    st.write_pdb(output_file)
+
+# Creates the process-wide PDBParser/PDBIO pair (not thread-safe, so one per process)
+def _init_worker():
+    """Import Bio.PDB and build the shared parser and writer for this process."""
+    global _PARSER, _IO, _EMPTY_STRUCTURE
+    # Bio.PDB is only imported when a structure object is actually needed
+    from Bio.PDB import PDBParser, PDBIO
+    from Bio.PDB.Structure import Structure
+    _PARSER = PDBParser(QUIET=True)
+    _IO = PDBIO()
+    _EMPTY_STRUCTURE = Structure("empty")
 
-    return chains, hetero_chains
+# Processes the PDB file by filtering its records, or by parsing, cleaning, and saving the structure
+def process_pdb(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag, use_biopython=False,
+                hetatm_bytes=None, use_gemmi=False, use_jit=False):
+    """Clean the PDB file, streaming its records unless a structure-based path (gemmi or Biopython) is requested."""
+    if use_gemmi and _gemmi_available():
+        clean_with_gemmi(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag)
+        return
+    # Without gemmi installed, --fast falls back to the default line filter
+    if not use_biopython:
+        filter_pdb_lines(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag, hetatm_bytes, use_jit)
+        return
 
-# Processes the PDB file by parsing, cleaning, and saving the structure
-def process_pdb(input_file, output_file, hetatm_set, keep_protein_only, remove_water_flag):
-    """Parse, clean, and save the PDB file."""
-    parser = PDBParser(QUIET=True)
-    structure = parser.get_structure("protein", input_file)
+    if _PARSER is None:
+        _init_worker()
+    structure = _PARSER.get_structure("protein", input_file)
 
     # Perform cleaning operations based on flags
-    if keep_protein_only:
-        structure = remove_water(structure)
-        structure = keep_only_protein(structure)
-        structure = remove_heteroatoms(structure, hetatm_set)
-    else:
-        if remove_water_flag:
-            structure = remove_water(structure)
-        if hetatm_set:
-            structure = remove_heteroatoms(structure, hetatm_set)
-
-    # Save the cleaned structure
-    io = PDBIO()
-    io.set_structure(structure)
-    io.save(output_file)
+    structure = clean_structure(structure, hetatm_set, keep_protein_only, remove_water_flag)
+
+    # Save the cleaned structure, then release it so the shared writer does not keep the atom tree alive
+    _IO.set_structure(structure)
+    try:
+        _IO.save(output_file)
+    finally:
+        _IO.set_structure(_EMPTY_STRUCTURE)
+
+# Runs process_pdb for one (input, output, options...) job inside a worker process
+def _worker(job):
+    """Clean one PDB file and return its path with the error message, if any."""
+    input_file, output_file, *options = job
+    try:
+        process_pdb(input_file, output_file, *options)
+    except Exception as e:
+        return input_file, str(e)
+    return input_file, None
+
+# Processes many PDB files in parallel, one file per task
+def process_batch(input_files, output_files, hetatm_set, keep_protein_only, remove_water_flag, use_biopython=False,
+                  hetatm_bytes=None, use_gemmi=False, use_jit=False, max_workers=None):
+    """Clean each input PDB file into its output path across a process pool and return the failures."""
+    # No more workers than files: each one is a fresh process with its own import cost
+    max_workers = max_workers or max(1, min(len(input_files), os.cpu_count() or 1))
+    chunksize = max(1, len(input_files) // (4 * max_workers))
+    jobs = zip(input_files, output_files, repeat(hetatm_set), repeat(keep_protein_only),
+               repeat(remove_water_flag), repeat(use_biopython), repeat(hetatm_bytes), repeat(use_gemmi),
+               repeat(use_jit))
+    initializer = _init_worker if use_biopython and not (use_gemmi and _gemmi_available()) else None
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer) as ex:
+        results = list(ex.map(_worker, jobs, chunksize=chunksize))
+    return [(input_file, error) for input_file, error in results if error is not None]
+
+# Expands the --input argument (PDB file, directory, or glob pattern) into a list of files
+def collect_inputs(input_arg):
+    """Return the PDB files matched by a file path, a directory, or a glob pattern."""
+    if os.path.isfile(input_arg):
+        return [input_arg]
+    if os.path.isdir(input_arg):
+        return sorted(glob.glob(os.path.join(input_arg, "*.pdb")))
+    return sorted(f for f in glob.glob(input_arg) if os.path.isfile(f))
 
 # Argument validation function
 def validate_args(args):
     """Validate argument combinations to avoid conflicts."""
     if args.keep_protein_only and args.hetatm:
         raise ValueError("Error: --keep-protein-only cannot be used together with --hetatm.")
+    if args.fast and args.biopython:
+        raise ValueError("Error: --fast cannot be used together with --biopython.")
+    if not all(0 < len(h.strip()) <= 3 and h.isascii() for h in args.hetatm):
+        raise ValueError("Error: --hetatm residue names must be 1-3 ASCII characters.")
+    # Normalize once to PDB residue name form; the byte filter right-justifies them to 3 columns
+    args.hetatm = [h.strip().upper() for h in args.hetatm]
     if not args.input or not args.output:
         raise ValueError("Error: Both --input and --output files must be specified.")
-    if not os.path.isfile(args.input):
+    args.input_files = collect_inputs(args.input)
+    if not args.input_files:
         raise FileNotFoundError(f"Error: Input file '{args.input}' not found.")
+    if not os.path.isfile(args.input):
+        if os.path.isfile(args.output):
+            raise ValueError("Error: --output must be a directory when --input is a directory or glob pattern.")
+        # Each input is written to --output under its own name; refuse collisions and overwriting inputs
+        args.output_files = [os.path.join(args.output, os.path.basename(f)) for f in args.input_files]
+        output_paths = [os.path.realpath(f) for f in args.output_files]
+        if len(set(output_paths)) != len(output_paths):
+            raise ValueError("Error: Several input files share a file name and would overwrite each other in --output.")
+        if set(output_paths) & {os.path.realpath(f) for f in args.input_files}:
+            raise ValueError("Error: --output directory must differ from the input directory when cleaning several files.")
 
 # Main Function
 def main():
     """Main function to handle argument parsing and execution."""
     parser = argparse.ArgumentParser(description="Clean PDB files by removing water, heteroatoms, and non-protein residues.")
-    parser.add_argument("-i", "--input", type=str, required=True, help="Path to the input PDB file.")
-    parser.add_argument("-o", "--output", type=str, required=True, help="Path to save the cleaned PDB file.")
+    parser.add_argument("-i", "--input", type=str, required=True, help="Path to the input PDB file, or a directory / glob pattern of PDB files to clean in parallel.")
+    parser.add_argument("-o", "--output", type=str, required=True, help="Path to save the cleaned PDB file (a directory when cleaning several files).")
     parser.add_argument("-r", "--hetatm", type=str, nargs="*", default=[], help="List of heteroatoms to remove.")
     parser.add_argument("-p", "--keep-protein-only", action="store_true", help="Remove all non-protein residues and specified heteroatoms. Keeps only protein residues.")
     parser.add_argument("-w", "--remove-water", action="store_true", help="Remove all water molecules from the structure.")
+    parser.add_argument("-b", "--biopython", action="store_true", help="Clean through the Biopython structure tree and rewrite the file with PDBIO (renumbers atoms).")
+    parser.add_argument("-j", "--jit", action="store_true", help="Run the line filter as a Numba-compiled kernel (needs numba; adds ~0.5 s startup per process).")
+    parser.add_argument("-f", "--fast", action="store_true", help="Clean through gemmi's C++ structure parser and writer (falls back to the default line filter if gemmi is not installed).")
 
     args = parser.parse_args()
 
     # Validate arguments
     try:
         validate_args(args)
-        process_pdb(args.input, args.output, set(args.hetatm), args.keep_protein_only, args.remove_water)
-        print(f"\nSuccessfully processed PDB file '{args.input}' and saved to '{args.output}'.")
+        # Encode the heteroatom names once for the byte-level line filter
+        hetatm_set = set(args.hetatm)
+        hetatm_bytes = encode_resnames(hetatm_set)
+        if args.fast and not _gemmi_available():
+            print("Notice: gemmi is not installed; --fast falls back to the default line filter.")
+        if os.path.isfile(args.input):
+            process_pdb(args.input, args.output, hetatm_set, args.keep_protein_only, args.remove_water, args.biopython,
+                        hetatm_bytes, args.fast, args.jit)
+            print(f"\nSuccessfully processed PDB file '{args.input}' and saved to '{args.output}'.")
+            return
+
+        os.makedirs(args.output, exist_ok=True)
+        failures = process_batch(args.input_files, args.output_files, hetatm_set, args.keep_protein_only,
+                                 args.remove_water, args.biopython, hetatm_bytes, args.fast, args.jit)
+        for input_file, error in failures:
+            print(f"Error: '{input_file}': {error}")
+        print(f"\nSuccessfully processed {len(args.input_files) - len(failures)} of {len(args.input_files)} PDB files into '{args.output}'.")
     except Exception as e:
         print(f"Error: {e}")
 